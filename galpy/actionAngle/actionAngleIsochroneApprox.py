@@ -151,8 +151,8 @@ class actionAngleIsochroneApprox(actionAngle):
             if numpy.any((numpy.fabs(numpy.amax(anglezI,axis=1)-_TWOPI) > _ANGLETOL)\
                           *(numpy.fabs(numpy.amin(anglezI,axis=1)) > _ANGLETOL)): #pragma: no cover
                 warnings.warn("Full vertical angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-            danglerI= ((numpy.roll(anglerI,-1,axis=1)-anglerI) % _TWOPI)[:,:-1]
-            danglezI= ((numpy.roll(anglezI,-1,axis=1)-anglezI) % _TWOPI)[:,:-1]
+            danglerI= numpy.diff(anglerI,axis=1) % _TWOPI
+            danglezI= numpy.diff(anglezI,axis=1) % _TWOPI
             if kwargs.get('cumul',False):
                 sumFunc= numpy.cumsum
             else:
@@ -162,7 +162,7 @@ class actionAngleIsochroneApprox(actionAngle):
             if _isNonAxi(self._pot):
                 lzI= numpy.reshape(acfs[1],R.shape)[:,:-1]
                 anglephiI= numpy.reshape(acfs[7],R.shape)
-                danglephiI= ((numpy.roll(anglephiI,-1,axis=1)-anglephiI) % _TWOPI)[:,:-1]
+                danglephiI= numpy.diff(anglephiI,axis=1) % _TWOPI
                 if numpy.any((numpy.fabs(numpy.amax(anglephiI,axis=1)-_TWOPI) > _ANGLETOL)\
                               *(numpy.fabs(numpy.amin(anglephiI,axis=1)) > _ANGLETOL)): #pragma: no cover
                     warnings.warn("Full azimuthal angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
@@ -255,8 +255,8 @@ class actionAngleIsochroneApprox(actionAngle):
             if numpy.any((numpy.fabs(numpy.amax(anglezI,axis=1)-_TWOPI) > _ANGLETOL)\
                           *(numpy.fabs(numpy.amin(anglezI,axis=1)) > _ANGLETOL)): #pragma: no cover
                 warnings.warn("Full vertical angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-            danglerI= ((numpy.roll(anglerI,-1,axis=1)-anglerI) % _TWOPI)[:,:-1]
-            danglezI= ((numpy.roll(anglezI,-1,axis=1)-anglezI) % _TWOPI)[:,:-1]
+            danglerI= numpy.diff(anglerI,axis=1) % _TWOPI
+            danglezI= numpy.diff(anglezI,axis=1) % _TWOPI
             jr= numpy.sum(jrI*danglerI,axis=1)/numpy.sum(danglerI,axis=1)
             jz= numpy.sum(jzI*danglezI,axis=1)/numpy.sum(danglezI,axis=1)
             if _isNonAxi(self._pot): #pragma: no cover
@@ -265,7 +265,7 @@ class actionAngleIsochroneApprox(actionAngle):
                 if numpy.any((numpy.fabs(numpy.amax(anglephiI,axis=1)-_TWOPI) > _ANGLETOL)\
                               *(numpy.fabs(numpy.amin(anglephiI,axis=1)) > _ANGLETOL)): #pragma: no cover
                     warnings.warn("Full azimuthal angle range not covered for at least one object; actions are likely not reliable",galpyWarning)
-                danglephiI= ((numpy.roll(anglephiI,-1,axis=1)-anglephiI) % _TWOPI)[:,:-1]
+                danglephiI= numpy.diff(anglephiI,axis=1) % _TWOPI
                 lz= numpy.sum(lzI*danglephiI,axis=1)/numpy.sum(danglephiI,axis=1)
             else:
                 lz= R[:,len(ts)//2]*vT[:,len(ts)//2]
@@ -394,15 +394,15 @@ class actionAngleIsochroneApprox(actionAngle):
             jzI= numpy.reshape(acfs[2],R.shape)[:,:-1]
             anglerI= numpy.reshape(acfs[6],R.shape)
             anglezI= numpy.reshape(acfs[8],R.shape)
-            danglerI= ((numpy.roll(anglerI,-1,axis=1)-anglerI) % _TWOPI)[:,:-1]
-            danglezI= ((numpy.roll(anglezI,-1,axis=1)-anglezI) % _TWOPI)[:,:-1]
+            danglerI= numpy.diff(anglerI,axis=1) % _TWOPI
+            danglezI= numpy.diff(anglezI,axis=1) % _TWOPI
             if True:
                 sumFunc= numpy.cumsum
             jr= sumFunc(jrI*danglerI,axis=1)/sumFunc(danglerI,axis=1)
             jz= sumFunc(jzI*danglezI,axis=1)/sumFunc(danglezI,axis=1)
             lzI= numpy.reshape(acfs[1],R.shape)[:,:-1]
             anglephiI= numpy.reshape(acfs[7],R.shape)
-            danglephiI= ((numpy.roll(anglephiI,-1,axis=1)-anglephiI) % _TWOPI)[:,:-1]
+            danglephiI= numpy.diff(anglephiI,axis=1) % _TWOPI
             lz= sumFunc(lzI*danglephiI,axis=1)/sumFunc(danglephiI,axis=1)
             from ..orbit import Orbit
             if isinstance(args[0],Orbit) and hasattr(args[0],'t'):
@@ -1748,10 +1748,16 @@ class streamdf(df):
                         numpy.cross(da,self._dsigomeanProgDirection),axis=1))],
                                            self._dsigomeanProgDirection)       
         if interp:
-            dist= numpy.fabs(dapar-self._interpolatedThetasTrack)
+            thetasTrack= self._interpolatedThetasTrack
         else:
-            dist= numpy.fabs(dapar-self._thetasTrack)
-        return numpy.argmin(dist)
+            thetasTrack= self._thetasTrack
+        #thetasTrack is sorted, so find the closest point through bisection
+        #rather than through a linear scan
+        indx= numpy.searchsorted(thetasTrack,dapar)
+        if indx > 0 and (indx == len(thetasTrack)
+                         or thetasTrack[indx]-dapar >= dapar-thetasTrack[indx-1]):
+            indx-= 1
+        return indx
 
 #########DISTRIBUTION AS A FUNCTION OF ANGLE ALONG THE STREAM##################
     def pOparapar(self,Opar,apar,tdisrupt=None):
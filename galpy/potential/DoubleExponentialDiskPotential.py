@@ -4,10 +4,27 @@
 #
 #                                      rho(R,z) = rho_0 e^-R/h_R e^-|z|/h_z
 ###############################################################################
+import hashlib
+from functools import wraps
 import numpy
 from scipy import special
 from ..util import conversion
-from .Potential import Potential, check_potential_inputs_not_arrays
+from .Potential import Potential
+
+def scalarVectorDecorator(func):
+    """Decorator to handle scalar and arbitrary-shape array input for the
+    quadrature-based methods, which internally operate on flattened arrays"""
+    @wraps(func)
+    def scalar_vector_wrapper(self,R,z,*args,**kwargs):
+        if isinstance(R,(float,int)):
+            return func(self,numpy.array([R]),numpy.array([z]),
+                        *args,**kwargs)[0]
+        outShape= R.shape # this code can't do arbitrary shapes
+        # broadcast_to gives a zero-copy view when z is a scalar
+        z= numpy.broadcast_to(z,outShape)
+        return numpy.reshape(func(self,R.flatten(),z.flatten(),
+                                  *args,**kwargs),outShape)
+    return scalar_vector_wrapper
 
 def _de_psi(t):
     return t*numpy.tanh(numpy.pi/2.*numpy.sinh(t))
@@ -78,20 +95,48 @@ class DoubleExponentialDiskPotential(Potential):
         # For double-exponential formula
         self._de_h= de_h
         self._de_n= de_n
-        self._de_j0zeros= special.jn_zeros(0,self._de_n)/numpy.pi
-        self._de_j1zeros= special.jn_zeros(1,self._de_n)/numpy.pi
-        self._de_j0_xs= numpy.pi/self._de_h\
-            *_de_psi(self._de_h*self._de_j0zeros)
-        self._de_j0_weights= 2./(numpy.pi*self._de_j0zeros\
-                               *special.j1(numpy.pi*self._de_j0zeros)**2.)\
+        # The Bessel zeros are only needed to set up the abscissae and
+        # weights, so they are not kept around
+        de_j0zeros= special.jn_zeros(0,self._de_n)/numpy.pi
+        de_j1zeros= special.jn_zeros(1,self._de_n)/numpy.pi
+        pi_j0zeros= numpy.pi*de_j0zeros
+        pi_j1zeros= numpy.pi*de_j1zeros
+        h_j0zeros= self._de_h*de_j0zeros
+        h_j1zeros= self._de_h*de_j1zeros
+        self._de_j0_xs= numpy.pi/self._de_h*_de_psi(h_j0zeros)
+        self._de_j0_weights= 2./(pi_j0zeros\
+                               *special.j1(pi_j0zeros)**2.)\
                                *special.j0(self._de_j0_xs)\
-                               *_de_psiprime(self._de_h*self._de_j0zeros)
-        self._de_j1_xs= numpy.pi/self._de_h\
-            *_de_psi(self._de_h*self._de_j1zeros)
-        self._de_j1_weights= 2./(numpy.pi*self._de_j1zeros\
-                               *special.jv(2,numpy.pi*self._de_j1zeros)**2.)\
+                               *_de_psiprime(h_j0zeros)
+        self._de_j1_xs= numpy.pi/self._de_h*_de_psi(h_j1zeros)
+        # By the recurrence J2(x)= 2 J1(x)/x - J0(x), J2^2 = J0^2 at the
+        # zeros of J1, avoiding the much slower generic-order jv call
+        self._de_j1_weights= 2./(pi_j1zeros\
+                               *special.j0(pi_j1zeros)**2.)\
                                *special.j1(self._de_j1_xs)\
-                               *_de_psiprime(self._de_h*self._de_j1zeros)
+                               *_de_psiprime(h_j1zeros)
+        # _de_psiprime overflows to NaN for the largest zeros; those nodes
+        # never contribute to the integrals (nansum used to skip them), so
+        # their weights can safely be zeroed
+        self._de_j0_weights[numpy.isnan(self._de_j0_weights)]= 0.
+        self._de_j1_weights[numpy.isnan(self._de_j1_weights)]= 0.
+        # Constant factors of the quadrature that would otherwise be
+        # recomputed on every evaluation
+        self._alpha2= self._alpha**2.
+        self._beta2= self._beta**2.
+        self._de_fourpialpha= 4.*numpy.pi*self._alpha
+        self._de_j1_weights_over_xs= self._de_j1_weights/self._de_j1_xs
+        # Stacked abscissae and signed weights with which _R2deriv evaluates
+        # its two Bessel integrals in a single pass
+        self._de_j01_xs= numpy.concatenate((self._de_j0_xs,self._de_j1_xs))
+        self._de_j01_xs2= self._de_j01_xs**2.
+        self._de_j01_weights= numpy.concatenate(\
+            (self._de_j0_weights,-self._de_j1_weights_over_xs))
+        # One-slot cache of the (R,z)-dependent quadrature intermediates, for
+        # the repeated potential/force/derivative calls at the same point
+        # during orbit integration
+        self._de_common_hash= None
+        self._de_common_cache= {}
         # Potential at zero in case we want that
         _gamma= self._beta/self._alpha
         _gamma2= _gamma**2.
@@ -107,6 +152,49 @@ class DoubleExponentialDiskPotential(Potential):
                      and not isinstance(normalize,bool)): #pragma: no cover
             self.normalize(normalize)
 
+    def _de_common(self,R,z,xs):
+        """
+        NAME:
+           _de_common
+        PURPOSE:
+           compute the (R,z)-dependent parts of the quadrature integrands
+           that are shared between the potential/force/derivative methods,
+           caching them for the common case that those methods are called
+           back-to-back at the same (R,z) (e.g., during orbit integration);
+           R and z need to be flattened ndarrays
+        INPUT:
+           R - Cylindrical Galactocentric radius (flattened ndarray)
+           z - vertical height (flattened ndarray)
+           xs - Ogata abscissae to use ('j0', 'j1', or the stacked 'j01')
+        OUTPUT:
+           (xR,xR2,emxRaz,pref,embz) with xR= xs/R, xR2= xR^2,
+           emxRaz= exp(-xR*|z|), pref= (alpha^2+xR^2)^-1.5/(beta^2-xR^2),
+           and embz= exp(-beta*|z|); do not modify these in place!
+        HISTORY:
+           2021-06-15 - Written - Bovy (UofT)
+        """
+        new_hash= hashlib.md5(numpy.array([R,z])).hexdigest()
+        if new_hash != self._de_common_hash:
+            self._de_common_hash= new_hash
+            az= numpy.fabs(z)[:,numpy.newaxis]
+            self._de_common_cache= {'az': az,
+                                    'embz': numpy.exp(-self._beta*az)}
+        cache= self._de_common_cache
+        if not xs in cache:
+            if xs == 'j01' and 'j0' in cache and 'j1' in cache:
+                # The stacked abscissae are just the j0 and j1 ones, so when
+                # both of those are already cached, stitch them together
+                # rather than re-evaluating the exponentials
+                cache['j01']= tuple(numpy.concatenate((c0,c1),axis=1)
+                                    for c0,c1 in zip(cache['j0'],cache['j1']))
+            else:
+                xR= getattr(self,'_de_%s_xs' % xs)/R[:,numpy.newaxis]
+                xR2= xR*xR
+                cache[xs]= (xR,xR2,numpy.exp(-xR*cache['az']),
+                            (self._alpha2+xR2)**-1.5/(self._beta2-xR2))
+        return cache[xs]+(cache['embz'],)
+
+    @scalarVectorDecorator
     def _evaluate(self,R,z,phi=0.,t=0.,dR=0,dphi=0):
         """
         NAME:
@@ -125,29 +213,20 @@ class DoubleExponentialDiskPotential(Potential):
            2012-12-26 - New method using Gaussian quadrature between zeros - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
         """
-        if isinstance(R,(float,int)):
-            floatIn= True
-            R= numpy.array([R])
-            z= numpy.array([z])
-        else:
-            if isinstance(z,float):
-                z= z*numpy.ones_like(R)
-            floatIn= False
-            outShape= R.shape # this code can't do arbitrary shapes
-            R= R.flatten()
-            z= z.flatten()
-        fun= lambda x: (self._alpha**2.+(x/R[:,numpy.newaxis])**2.)**-1.5\
-            *(self._beta*numpy.exp(-x/R[:,numpy.newaxis]*numpy.fabs(z[:,numpy.newaxis]))
-              -x/R[:,numpy.newaxis]*numpy.exp(-self._beta*numpy.fabs(z[:,numpy.newaxis])))\
-              /(self._beta**2.-(x/R[:,numpy.newaxis])**2.)
-        out= -4.*numpy.pi*self._alpha/R*\
-            numpy.nansum(fun(self._de_j0_xs)*self._de_j0_weights,
-                         axis=1)
+        # Build the integrand from the shared, cached pieces (see _de_common)
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j0')
+        intgrd= self._beta*emxRaz
+        intgrd-= xR*embz
+        intgrd*= pref
+        # einsum fuses the weight multiplication and the reduction into a
+        # single pass; zero out the NaNs at x/R = beta that nansum used to skip
+        numpy.nan_to_num(intgrd,copy=False)
+        out= -self._de_fourpialpha/R\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j0_weights)
         out[(R == 0)*(z == 0)]= self._pot_zero
-        if floatIn: return out[0]
-        else: return numpy.reshape(out,outShape)
-    
-    @check_potential_inputs_not_arrays
+        return out
+
+    @scalarVectorDecorator
     def _Rforce(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -165,15 +244,18 @@ class DoubleExponentialDiskPotential(Potential):
            2010-04-16 - Written - Bovy (NYU)
            2012-12-26 - New method using Gaussian quadrature between zeros - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
+           2021-06-15 - Vectorized for array input using broadcasting - Bovy (UofT)
         """
-        fun=  lambda x: x*(self._alpha**2.+(x/R)**2.)**-1.5\
-            *(self._beta*numpy.exp(-x/R*numpy.fabs(z))
-              -x/R*numpy.exp(-self._beta*numpy.fabs(z)))\
-              /(self._beta**2.-(x/R)**2.)
-        return -4.*numpy.pi*self._alpha/R**2.\
-            *numpy.nansum(fun(self._de_j1_xs)*self._de_j1_weights)
-    
-    @check_potential_inputs_not_arrays
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j1')
+        intgrd= self._beta*emxRaz
+        intgrd-= xR*embz
+        intgrd*= self._de_j1_xs
+        intgrd*= pref
+        numpy.nan_to_num(intgrd,copy=False)
+        return -self._de_fourpialpha/R**2.\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j1_weights)
+
+    @scalarVectorDecorator
     def _zforce(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -191,19 +273,20 @@ class DoubleExponentialDiskPotential(Potential):
            2010-04-16 - Written - Bovy (NYU)
            2012-12-26 - New method using Gaussian quadrature between zeros - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
+           2021-06-15 - Vectorized for array input using broadcasting - Bovy (UofT)
         """
-        fun= lambda x: (self._alpha**2.+(x/R)**2.)**-1.5*x/R\
-            *(numpy.exp(-x/R*numpy.fabs(z))
-              -numpy.exp(-self._beta*numpy.fabs(z)))\
-              /(self._beta**2.-(x/R)**2.)
-        out= -4.*numpy.pi*self._alpha*self._beta/R*\
-            numpy.nansum(fun(self._de_j0_xs)*self._de_j0_weights)
-        if z > 0.:
-            return out
-        else:
-            return -out
-
-    @check_potential_inputs_not_arrays
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j0')
+        intgrd= emxRaz-embz
+        intgrd*= xR
+        intgrd*= pref
+        numpy.nan_to_num(intgrd,copy=False)
+        out= -self._de_fourpialpha*self._beta/R\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j0_weights)
+        # Branchless sign pick-up: the integral is computed with |z|
+        out*= numpy.copysign(1.,z)
+        return out
+
+    @scalarVectorDecorator
     def _R2deriv(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -220,17 +303,18 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2012-12-27 - Written - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
+           2021-06-15 - Vectorized for array input using broadcasting - Bovy (UofT)
         """
-        fun=  lambda x: x**2*(self._alpha**2.+(x/R)**2.)**-1.5\
-            *(self._beta*numpy.exp(-x/R*numpy.fabs(z))
-              -x/R*numpy.exp(-self._beta*numpy.fabs(z)))\
-              /(self._beta**2.-(x/R)**2.)
-        return 4.*numpy.pi*self._alpha/R**3.\
-            *numpy.nansum(fun(self._de_j0_xs)*self._de_j0_weights
-                          -fun(self._de_j1_xs)/self._de_j1_xs\
-                          *self._de_j1_weights)
-    
-    @check_potential_inputs_not_arrays
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j01')
+        intgrd= self._beta*emxRaz
+        intgrd-= xR*embz
+        intgrd*= self._de_j01_xs2
+        intgrd*= pref
+        numpy.nan_to_num(intgrd,copy=False)
+        return self._de_fourpialpha/R**3.\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j01_weights)
+
+    @scalarVectorDecorator
     def _z2deriv(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -247,15 +331,18 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2012-12-26 - Written - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
+           2021-06-15 - Vectorized for array input using broadcasting - Bovy (UofT)
         """
-        fun= lambda x: (self._alpha**2.+(x/R)**2.)**-1.5*x/R\
-            *(x/R*numpy.exp(-x/R*numpy.fabs(z))
-              -self._beta*numpy.exp(-self._beta*numpy.fabs(z)))\
-              /(self._beta**2.-(x/R)**2.)
-        return -4.*numpy.pi*self._alpha*self._beta/R*\
-            numpy.nansum(fun(self._de_j0_xs)*self._de_j0_weights)
-
-    @check_potential_inputs_not_arrays
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j0')
+        intgrd= xR*emxRaz
+        intgrd-= self._beta*embz
+        intgrd*= xR
+        intgrd*= pref
+        numpy.nan_to_num(intgrd,copy=False)
+        return -self._de_fourpialpha*self._beta/R\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j0_weights)
+
+    @scalarVectorDecorator
     def _Rzderiv(self,R,z,phi=0.,t=0.):
         """
         NAME:
@@ -272,17 +359,18 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2013-08-28 - Written - Bovy (IAS)
            2020-12-24 - New method using Ogata's Bessel integral formula - Bovy (UofT)
+           2021-06-15 - Vectorized for array input using broadcasting - Bovy (UofT)
         """
-        fun= lambda x: (self._alpha**2.+(x/R)**2.)**-1.5*(x/R)**2.\
-            *(numpy.exp(-x/R*numpy.fabs(z))
-              -numpy.exp(-self._beta*numpy.fabs(z)))\
-              /(self._beta**2.-(x/R)**2.)
-        out= -4.*numpy.pi*self._alpha*self._beta/R*\
-            numpy.nansum(fun(self._de_j1_xs)*self._de_j1_weights)
-        if z > 0.:
-            return out
-        else:
-            return -out
+        xR,xR2,emxRaz,pref,embz= self._de_common(R,z,'j1')
+        intgrd= emxRaz-embz
+        intgrd*= xR2
+        intgrd*= pref
+        numpy.nan_to_num(intgrd,copy=False)
+        out= -self._de_fourpialpha*self._beta/R\
+            *numpy.einsum('ij,j->i',intgrd,self._de_j1_weights)
+        # Branchless sign pick-up: the integral is computed with |z|
+        out*= numpy.copysign(1.,z)
+        return out
 
     def _dens(self,R,z,phi=0.,t=0.):
         """
@@ -300,7 +388,11 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2010-08-08 - Written - Bovy (NYU)
         """
-        return numpy.exp(-self._alpha*R-self._beta*numpy.fabs(z))
+        # Accumulate the exponent in place to avoid temporaries for array input
+        exparg= self._alpha*R
+        exparg+= self._beta*numpy.fabs(z)
+        exparg*= -1.
+        return numpy.exp(exparg)
 
     def _surfdens(self,R,z,phi=0.,t=0.):
         """
@@ -318,5 +410,7 @@ class DoubleExponentialDiskPotential(Potential):
         HISTORY:
            2018-08-19 - Written - Bovy (UofT)
         """
-        return 2.*numpy.exp(-self._alpha*R)/self._beta\
-            *(1.-numpy.exp(-self._beta*numpy.fabs(z)))
+        out= numpy.exp(-self._alpha*R)
+        out*= 2./self._beta
+        out*= 1.-numpy.exp(-self._beta*numpy.fabs(z))
+        return out
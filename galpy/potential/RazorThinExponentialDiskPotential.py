@@ -55,6 +55,11 @@ class RazorThinExponentialDiskPotential(Potential):
         self._scale= self._hr
         self._alpha= 1./self._hr
         self._glx, self._glw= numpy.polynomial.legendre.leggauss(self._glorder)
+        # Cache the scaled integration grids, because they only depend on
+        # the (fixed) integration limits
+        self._glx01= 0.5*(self._glx+1.)
+        self._evalks= 10.*self._glx01
+        self._evalweights= 10.*self._glw
         if normalize or \
                 (isinstance(normalize,(int,float)) \
                      and not isinstance(normalize,bool)): #pragma: no cover
@@ -80,9 +85,8 @@ class RazorThinExponentialDiskPotential(Potential):
             if numpy.fabs(z) < 10.**-6.:
                 y= 0.5*self._alpha*R
                 return -numpy.pi*R*(special.i0(y)*special.k1(y)-special.i1(y)*special.k0(y))
-            kalphamax= 10.
-            ks= kalphamax*0.5*(self._glx+1.)
-            weights= kalphamax*self._glw
+            ks= self._evalks
+            weights= self._evalweights
             sqrtp= numpy.sqrt(z**2.+(ks+R)**2.)
             sqrtm= numpy.sqrt(z**2.+(ks-R)**2.)
             evalInt= numpy.arcsin(2.*ks/(sqrtp+sqrtm))*ks*special.k0(self._alpha*ks)
@@ -106,19 +110,18 @@ class RazorThinExponentialDiskPotential(Potential):
            2012-12-27 - Written - Bovy (IAS)
         """
         if self._new:
-            #if R > 6.: return self._kp(R,z)
             if numpy.fabs(z) < 10.**-6.:
                 y= 0.5*self._alpha*R
                 return -2.*numpy.pi*y*(special.i0(y)*special.k0(y)-special.i1(y)*special.k1(y))
             kalphamax1= R
-            ks1= kalphamax1*0.5*(self._glx+1.)
+            ks1= kalphamax1*self._glx01
             weights1= kalphamax1*self._glw
             sqrtp= numpy.sqrt(z**2.+(ks1+R)**2.)
             sqrtm= numpy.sqrt(z**2.+(ks1-R)**2.)
             evalInt1= ks1**2.*special.k0(ks1*self._alpha)*((ks1+R)/sqrtp-(ks1-R)/sqrtm)/numpy.sqrt(R**2.+z**2.-ks1**2.+sqrtp*sqrtm)/(sqrtp+sqrtm)
             if R < 10.:
                 kalphamax2= 10.
-                ks2= (kalphamax2-kalphamax1)*0.5*(self._glx+1.)+kalphamax1
+                ks2= (kalphamax2-kalphamax1)*self._glx01+kalphamax1
                 weights2= (kalphamax2-kalphamax1)*self._glw
                 sqrtp= numpy.sqrt(z**2.+(ks2+R)**2.)
                 sqrtm= numpy.sqrt(z**2.+(ks2-R)**2.)
@@ -146,18 +149,17 @@ class RazorThinExponentialDiskPotential(Potential):
            2012-12-27 - Written - Bovy (IAS)
         """
         if self._new:
-            #if R > 6.: return self._kp(R,z)
             if numpy.fabs(z) < 10.**-6.:
                 return 0.
             kalphamax1= R
-            ks1= kalphamax1*0.5*(self._glx+1.)
+            ks1= kalphamax1*self._glx01
             weights1= kalphamax1*self._glw
             sqrtp= numpy.sqrt(z**2.+(ks1+R)**2.)
             sqrtm= numpy.sqrt(z**2.+(ks1-R)**2.)
             evalInt1= ks1**2.*special.k0(ks1*self._alpha)*(1./sqrtp+1./sqrtm)/numpy.sqrt(R**2.+z**2.-ks1**2.+sqrtp*sqrtm)/(sqrtp+sqrtm)
             if R < 10.:
                 kalphamax2= 10.
-                ks2= (kalphamax2-kalphamax1)*0.5*(self._glx+1.)+kalphamax1
+                ks2= (kalphamax2-kalphamax1)*self._glx01+kalphamax1
                 weights2= (kalphamax2-kalphamax1)*self._glw
                 sqrtp= numpy.sqrt(z**2.+(ks2+R)**2.)
                 sqrtm= numpy.sqrt(z**2.+(ks2-R)**2.)
@@ -1066,7 +1066,6 @@ def test_potential_array_input():
     rmpots.append('TriaxialJaffePotential')
     rmpots.append('TriaxialNFWPotential')
     rmpots.append('TwoPowerTriaxialPotential')
-    rmpots.append('DoubleExponentialDiskPotential')
     rmpots.append('RazorThinExponentialDiskPotential')
     rmpots.append('AnyAxisymmetricRazorThinDiskPotential')
     rmpots.append('AnySphericalPotential')